@@ -4,9 +4,12 @@
 # 基于 GTK3 和 uinput，实现硬件级修饰键语义、多点触控、空格光标模式等
 # Based on GTK3 and uinput, providing hardware‑level modifier semantics, multi‑touch, space cursor mode, etc.
 
-import configparser
+import functools
+import math
 import os
+import threading
 import time
+import types
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Set, Tuple, Union
 
@@ -105,9 +108,13 @@ KEY_MAPPING: Dict[int, str] = {
 # Reverse mapping from label to key code, used for layout construction
 LABEL_TO_KEY = {label: code for code, label in KEY_MAPPING.items()}
 
-# 修饰键集合
-# Set of modifier keys
-MODIFIER_KEYS = {
+# 全部键码的只读序列，供 uinput 设备初始化直接使用
+# Read-only sequence of all key codes, used directly for uinput device initialization
+_ALL_KEYCODES = tuple(KEY_MAPPING)
+
+# 修饰键集合（冻结为 frozenset，成员测试更快且可安全用作默认参数）
+# Set of modifier keys (frozen: faster membership tests and safe as a default argument)
+MODIFIER_KEYS = frozenset({
     uinput.KEY_LEFTSHIFT,
     uinput.KEY_RIGHTSHIFT,
     uinput.KEY_LEFTCTRL,
@@ -116,11 +123,17 @@ MODIFIER_KEYS = {
     uinput.KEY_RIGHTALT,
     uinput.KEY_LEFTMETA,
     uinput.KEY_RIGHTMETA,
-}
+})
 
 # 仅 Shift 键，用于双按检测
 # Only Shift keys, used for double‑tap detection
-SHIFT_KEYS = {uinput.KEY_LEFTSHIFT, uinput.KEY_RIGHTSHIFT}
+SHIFT_KEYS = frozenset({uinput.KEY_LEFTSHIFT, uinput.KEY_RIGHTSHIFT})
+
+# 修饰键键码 -> 紧凑序号，修饰键状态以并行数组存储（见 QingBoard.__init__）
+# Modifier key code -> compact ordinal; modifier state lives in parallel arrays (see QingBoard.__init__)
+_MOD_INDEX = {key_code: index for index, key_code in enumerate(sorted(MODIFIER_KEYS))}
+_SHIFT_L_IDX = _MOD_INDEX[uinput.KEY_LEFTSHIFT]
+_SHIFT_R_IDX = _MOD_INDEX[uinput.KEY_RIGHTSHIFT]
 
 # 默认键盘布局（二维列表）
 # Default keyboard layout (2D list)
@@ -134,7 +147,7 @@ DEFAULT_LAYOUT = [
 
 # 按键宽度（列数），用于网格布局
 # Key width (in columns) for grid layout
-KEY_WIDTHS = {
+KEY_WIDTHS = types.MappingProxyType({
     "`": 1,
     "Space": 12,
     "CapsLock": 3,
@@ -143,11 +156,41 @@ KEY_WIDTHS = {
     "Backspace": 3,
     "\\": 3,
     "Enter": 4,
+})
+
+def _balance_row_widths(row: List[str], target_width: int) -> List[int]:
+    """通过将多余宽度分配到前面的按键，使整行宽度达到 target_width | Distribute extra width to earlier keys to reach target_width"""
+    widths = [KEY_WIDTHS.get(label, 2) for label in row]
+    deficit = target_width - sum(widths)
+    idx = 0
+    while deficit > 0 and widths:
+        widths[idx % len(widths)] += 1
+        idx += 1
+        deficit -= 1
+    return widths
+
+
+# 布局与宽度均为模块常量，均衡后的行宽在导入时计算一次
+# Layout and widths are module constants, so balanced row widths are computed once at import
+_TARGET_WIDTH = max(sum(KEY_WIDTHS.get(label, 2) for label in row) for row in DEFAULT_LAYOUT)
+_BALANCED_ROW_WIDTHS = [_balance_row_widths(row, _TARGET_WIDTH) for row in DEFAULT_LAYOUT]
+
+# 每个布局标签的预计算信息：(键码, 显示文本, 宽度, 是否修饰键)
+# Precomputed info per layout label: (key code, shown text, width, is modifier)
+KEY_INFO: Dict[str, Tuple[int, str, int, bool]] = {
+    label: (
+        LABEL_TO_KEY[label],
+        label.removesuffix("_L").removesuffix("_R"),
+        KEY_WIDTHS.get(label, 2),
+        LABEL_TO_KEY[label] in MODIFIER_KEYS,
+    )
+    for row in DEFAULT_LAYOUT
+    for label in row
 }
 
-# 带 Shift 时的符号映射（用于更新按键标签）
-# Symbol mapping when Shift is active (used to update key labels)
-SYMBOL_LABELS = {
+# 带 Shift 时的符号映射（只读视图，防止意外修改）
+# Symbol mapping when Shift is active (read-only view to guard against accidental mutation)
+SYMBOL_LABELS = types.MappingProxyType({
     "`": "~",
     "1": "!",
     "2": "@",
@@ -169,19 +212,48 @@ SYMBOL_LABELS = {
     ",": "<",
     ".": ">",
     "/": "?",
-}
+})
 
 # 配置文件中键名的别名映射
 # Alias mapping for key names in configuration file
-CONFIG_TOKEN_ALIASES = {
+CONFIG_TOKEN_ALIASES = types.MappingProxyType({
     "SHIFT": "LEFTSHIFT",
     "CTRL": "LEFTCTRL",
     "ALT": "LEFTALT",
     "SUPER": "LEFTMETA",
     "META": "LEFTMETA",
     "WIN": "LEFTMETA",
+})
+
+# 快捷键字符串归一化用的删除表：一趟 translate 去掉所有空白
+# Deletion table for shortcut-string normalization: one translate pass removes all whitespace
+_WS_STRIP = str.maketrans("", "", " \t")
+
+# 布尔配置值的写法表（与 configparser 兼容，配置文件手改也能识别）
+# Accepted spellings for boolean config values (configparser-compatible, so hand-edited files still parse)
+_BOOLEAN_STATES = types.MappingProxyType({
+    "1": True, "yes": True, "true": True, "on": True,
+    "0": False, "no": False, "false": False, "off": False,
+})
+
+# 键码到配置名的映射（写配置时使用），在模块级构建一次
+# Key code to config-name mapping (used when writing config), built once at module level
+_KEY_CODE_TO_NAME = {
+    uinput.KEY_LEFTSHIFT: "LEFTSHIFT",
+    uinput.KEY_RIGHTSHIFT: "RIGHTSHIFT",
+    uinput.KEY_LEFTCTRL: "LEFTCTRL",
+    uinput.KEY_RIGHTCTRL: "RIGHTCTRL",
+    uinput.KEY_LEFTALT: "LEFTALT",
+    uinput.KEY_RIGHTALT: "RIGHTALT",
+    uinput.KEY_LEFTMETA: "LEFTMETA",
+    uinput.KEY_RIGHTMETA: "RIGHTMETA",
+    uinput.KEY_SPACE: "SPACE",
 }
 
+# 配置名到键码的反向表，在导入时构建一次，解析时无需逐个 getattr
+# Reverse table from config name to key code, built once at import so parsing needs no getattr
+_TOKEN_TO_KEYCODE = {name[4:]: getattr(uinput, name) for name in dir(uinput) if name.startswith("KEY_")}
+
 # 预定义主题（RGB 值或颜色字符串）
 # Predefined themes (RGB values or color strings)
 THEMES = {
@@ -208,47 +280,178 @@ THEMES = {
     },
 }
 
+# 主题顺序与序号在导入时定型，构建下拉框时不再复制键列表做线性查找
+# Theme order and ordinals are fixed at import; building the combobox no longer copies the key list for a linear search
+_THEME_ORDER = tuple(THEMES)
+_THEME_INDEX = {name: index for index, name in enumerate(_THEME_ORDER)}
+
+# 每个主题的颜色字段在导入时编码为字节，CSS 缓存未命中时免去逐项查字典和 encode
+# Each theme's color fields are encoded to bytes at import, sparing per-field dict lookups and encodes on a CSS cache miss
+_THEME_FIELDS = {
+    name: {
+        b"bg": theme["bg"].encode(),
+        b"key": theme["key"].encode(),
+        b"border": theme["key_border"].encode(),
+        b"accent": theme["accent"].encode(),
+        b"text": theme["text"].encode(),
+    }
+    for name, theme in THEMES.items()
+}
+
+# CSS 模板：不变部分在导入时编码一次，更新时用一趟 % 格式化填入全部字段
+# CSS template: the invariant part is encoded once at import; updates fill every field in one % formatting pass
+_CSS_TEMPLATE = """
+#toplevel { background-color: rgb(%(bg)s); }
+#root { background-color: rgb(%(bg)s); margin: 0; padding: 0; }
+headerbar {
+    background-color: rgb(%(bg)s);
+    border: 0;
+    box-shadow: none;
+    min-height: 54px;
+}
+headerbar button {
+    background-image: none;
+    background-color: rgb(%(key)s);
+    border: 1px solid rgb(%(border)s);
+    min-height: 46px;
+    min-width: 0;                      /* 允许按钮宽度压缩，配合窗口宽度调整 | Allow button width to compress */
+    border-radius: 8px;
+    margin: 4px 0;
+}
+headerbar button:disabled {
+    background-image: none;
+    background-color: rgb(%(key)s);
+    border: 1px solid rgb(%(border)s);
+}
+headerbar .titlebutton {
+    min-width: 56px;
+    min-height: 46px;
+    background-color: rgb(%(key)s);
+}
+#combobox button.combo {
+    background-image: none;
+    background-color: rgb(%(key)s);
+    border: 1px solid rgb(%(border)s);
+    min-height: 46px;
+    min-width: 90px;
+    border-radius: 8px;
+}
+headerbar button label, #combobox button.combo label {
+    color: %(text)s;
+    font-size: %(fs1)spx;
+    font-weight: 600;
+}
+#grid { margin: 0; padding: 0; }
+.key-button {
+    border-radius: 8px;
+    border: 1px solid rgb(%(border)s);
+    background-image: none;
+    background-color: rgb(%(key)s);
+    box-shadow: none;
+    outline: none;
+    min-height: 48px;
+    min-width: 0;      /* 允许按键宽度压缩，支持窗口缩小 | Allow key width to compress */
+    margin: 0;
+    padding: 0;
+    color: %(text)s;
+    font-weight: 600;
+    font-size: %(fs)spx;
+}
+#caps-indicator {
+    background-image: none;
+    background-color: rgb(%(key)s);
+    border: 1px solid rgb(%(border)s);
+    border-radius: 8px;
+    min-height: 46px;
+    min-width: 85px;
+    margin: 4px 0;
+    padding: 0 8px;
+    color: %(text)s;
+    font-size: %(fs2)spx;
+    font-weight: 700;
+}
+#caps-indicator.caps-on {
+    color: rgba(%(accent)s, 1.0);
+}
+#caps-indicator.caps-on label {
+    color: rgba(%(accent)s, 1.0);
+}
+.key-button.pressed,
+.key-button.pressed:hover,
+.key-button.pressed:focus,
+.key-button.pressed:active {
+    background-color: rgba(%(accent)s, 0.28);
+    border-color: rgba(%(accent)s, 1.0);
+}
+.key-button.cursor-mode {
+    background-color: rgba(%(accent)s, 0.24);
+    border-color: rgba(%(accent)s, 1.0);
+}
+.key-button.cursor-mode label {
+    color: rgba(%(accent)s, 1.0);
+    font-weight: 700;
+}
+""".encode("utf-8")
+
+
+@functools.lru_cache(maxsize=32)
+def _build_css_bytes(theme_name: str, font_size: int) -> bytes:
+    """渲染指定主题与字号的 CSS 字节串；lru_cache 限界，乱按设置也不会无限增长 | Render the CSS bytes for a theme and font size; lru_cache bounds growth however much the settings are spammed"""
+    # 配置里的主题名可能不认识，退回默认主题的字段（与 _theme_colors 的回退一致）
+    # The configured theme name may be unknown; fall back to the default theme's fields (matching the _theme_colors fallback)
+    params = dict(_THEME_FIELDS.get(theme_name) or _THEME_FIELDS["Dark"])
+    params[b"fs"] = str(font_size).encode()
+    params[b"fs1"] = str(max(font_size - 1, 12)).encode()
+    params[b"fs2"] = str(max(font_size - 2, 11)).encode()
+    return _CSS_TEMPLATE % params
+
+
 # 鼠标事件模拟的触摸点 ID（非触摸设备）
 # Touch point ID for mouse events (non‑touch devices)
 MOUSE_TOUCH_ID = -1
 
+# Gdk 枚举成员提升为模块级纯 int 常量；事件处理里每次 Gdk.EventType.X 都是一次枚举包装器属性查找
+# Gdk enum members hoisted to plain module-level ints; every Gdk.EventType.X in the event handler is an enum-wrapper attribute lookup
+_ET_BUTTON_PRESS = int(Gdk.EventType.BUTTON_PRESS)
+_ET_BUTTON_RELEASE = int(Gdk.EventType.BUTTON_RELEASE)
+_ET_TOUCH_BEGIN = int(Gdk.EventType.TOUCH_BEGIN)
+_ET_TOUCH_END = int(Gdk.EventType.TOUCH_END)
+_ET_TOUCH_UPDATE = int(Gdk.EventType.TOUCH_UPDATE)
+_ET_MOTION_NOTIFY = int(Gdk.EventType.MOTION_NOTIFY)
+_INTERESTING_ETYPES = frozenset({
+    _ET_BUTTON_PRESS, _ET_BUTTON_RELEASE, _ET_TOUCH_BEGIN,
+    _ET_TOUCH_END, _ET_TOUCH_UPDATE, _ET_MOTION_NOTIFY,
+})
+_TOUCH_ETYPES = frozenset({_ET_TOUCH_BEGIN, _ET_TOUCH_END, _ET_TOUCH_UPDATE})
+_PRESS_ETYPES = frozenset({_ET_BUTTON_PRESS, _ET_TOUCH_BEGIN})
+_RELEASE_ETYPES = frozenset({_ET_BUTTON_RELEASE, _ET_TOUCH_END})
+
 
 # ------------------------- 状态定义 -------------------------
 # State definitions
 # -------------------------
 
-@dataclass
-class RepeatState:
-    """按键重复状态（按触摸点独立） | Key repeat state (independent per touch point)"""
-    delay_source: Optional[int] = None   # 延迟超时源 | Delay timeout source ID
-    repeat_source: Optional[int] = None  # 重复定时器源 | Repeat timer source ID
-
-
-@dataclass
-class ModifierState:
-    """修饰键全局状态 | Global modifier state"""
-    pressed: bool = False          # 是否有物理按下（至少一个触摸点） | Physically pressed (at least one touch point)
-    latched: bool = False          # 是否处于锁存状态（单按后锁住） | Latched (after a single tap)
-    used_in_combo: bool = False    # 是否在组合键中被使用（用于决定释放行为） | Used in a combination (affects release behavior)
-
-
-@dataclass
+@dataclass(slots=True)
 class TouchState:
-    """单个触摸点的状态 | State of a single touch point"""
+    """单个触摸点的状态（含重复与空格拖动，一次字典查找拿到全部） | State of a single touch point (incl. repeat and space drag, one dict lookup gets everything)"""
     key_code: int                   # 当前按下的键码 | Currently pressed key code
-    press_time: float               # 按下时的时间戳（单调时钟） | Press timestamp (monotonic clock)
+    press_time_ms: int              # 按下时的时间戳（GTK 事件时钟，毫秒） | Press timestamp (GTK event clock, milliseconds)
+    repeat_wake_at: float = 0.0     # 下次重复触发时刻，0 表示未在重复 | Next repeat fire time; 0 means not repeating
+    space: Optional["SpaceTrackingState"] = None  # 空格拖动状态（仅空格键） | Space drag state (Space key only)
 
 
-@dataclass
+@dataclass(slots=True)
 class SpaceTrackingState:
     """空格拖动状态（按触摸点独立） | Space drag state (independent per touch point)"""
     cursor_mode: bool = False       # 是否已进入光标模式 | Whether cursor mode is active
-    accum_x: float = 0.0            # X 方向累积位移 | Accumulated X displacement
-    accum_y: float = 0.0            # Y 方向累积位移 | Accumulated Y displacement
+    accum_x: int = 0                # X 方向累积位移（×256 定点） | Accumulated X displacement (fixed point, x256)
+    accum_y: int = 0                # Y 方向累积位移（×256 定点） | Accumulated Y displacement (fixed point, x256)
     last_x: float = 0.0             # 上次事件 X 坐标 | Last event X coordinate
     last_y: float = 0.0             # 上次事件 Y 坐标 | Last event Y coordinate
     last_motion_at: float = 0.0     # 上次移动事件的时间（秒） | Last motion event time (seconds)
+    frame_dist: float = 0.0         # 本帧内累计的移动距离（测速用） | Distance moved within the current frame (for speed)
     long_press_source: Optional[int] = None  # 长按超时源 | Long‑press timeout source ID
+    cursor_pump_source: Optional[int] = None  # 光标模式 60Hz 发射泵 | 60 Hz emission pump while in cursor mode
 
 
 # ------------------------- 键盘引擎 -------------------------
@@ -257,26 +460,77 @@ class SpaceTrackingState:
 
 class KeyboardEngine:
     """封装 uinput 设备，负责发送按键事件 | Wraps the uinput device, responsible for sending key events"""
+    # 固定槽位：属性读写绕过实例 __dict__，这是打字时的稳态热路径
+    # Fixed slots: attribute access skips the instance __dict__ on the steady-state typing hot path
+    __slots__ = ("device", "_down", "_pending", "_emit")
+
     def __init__(self) -> None:
         # 创建 uinput 设备，支持所有定义的按键
         # Create uinput device supporting all defined keys
-        self.device = uinput.Device(list(KEY_MAPPING.keys()))
-        self.down_keys: Set[int] = set()  # 当前按下的键码集合（用于去重） | Currently pressed key codes (for deduplication)
+        self.device = uinput.Device(_ALL_KEYCODES)
+        # 按下状态位图：每个 Linux 键码一位（KEY_MAX < 768，共 96 字节），比集合哈希更省
+        # Pressed-state bitmap: one bit per Linux key code (KEY_MAX < 768, 96 bytes total), cheaper than set hashing
+        self._down = bytearray(96)
+        # 事件先入队，flush 时一次性提交并只同步一次；一个手势只产生一个 SYN_REPORT
+        # Events are queued first and committed in one flush with a single syn; one gesture costs one SYN_REPORT
+        self._pending: List[Tuple[int, int]] = []
+        # 绑定一次 emit 方法，flush 热路径省去两级属性解析
+        # Bind the emit method once so the flush hot path skips two attribute resolutions
+        self._emit = self.device.emit
 
     def set_key_state(self, key_code: int, pressed: bool) -> None:
         """设置按键状态（按下/释放），避免重复发送相同状态 | Set key state (press/release) without sending duplicate events"""
-        is_down = key_code in self.down_keys
+        # uinput 常量是 (事件类型, 键码) 元组，用数字键码做位索引
+        # uinput constants are (event type, key code) tuples; bit-index by the numeric code
+        code = key_code[1]
+        byte, mask = code >> 3, 1 << (code & 7)
+        is_down = self._down[byte] & mask
         if pressed and not is_down:
-            self.device.emit(key_code, 1)  # 1 = 按下 | 1 = press
-            self.down_keys.add(key_code)
+            self._pending.append((key_code, 1))  # 1 = 按下 | 1 = press
+            self._down[byte] |= mask
         elif not pressed and is_down:
-            self.device.emit(key_code, 0)  # 0 = 释放 | 0 = release
-            self.down_keys.discard(key_code)
+            self._pending.append((key_code, 0))  # 0 = 释放 | 0 = release
+            self._down[byte] &= ~mask
 
     def tap_key(self, key_code: int) -> None:
         """发送一次按键点击（按下后立即释放） | Send a single key tap (press then immediately release)"""
-        self.device.emit(key_code, 1)
-        self.device.emit(key_code, 0)
+        self._pending.append((key_code, 1))
+        self._pending.append((key_code, 0))
+
+    def tap_key_n(self, key_code: int, count: int) -> None:
+        """发送 n 次按键点击，整批只在 flush 时同步一次 | Send n key taps; the whole batch syncs once at flush"""
+        self._pending.extend(((key_code, 1), (key_code, 0)) * count)
+
+    def emit_combo(self, key_codes: List[int]) -> None:
+        """发送组合键：依次按下，再逆序释放 | Emit a combo: press in order, release in reverse"""
+        for key_code in key_codes:
+            self._pending.append((key_code, 1))
+        for key_code in reversed(key_codes):
+            self._pending.append((key_code, 0))
+
+    def flush(self) -> None:
+        """提交队列中的事件，仅在最后一个事件上发送 SYN_REPORT | Commit queued events, issuing SYN_REPORT only on the last one"""
+        pending = self._pending
+        if not pending:
+            return
+        emit = self._emit
+        last = len(pending) - 1
+        for i, (key_code, value) in enumerate(pending):
+            emit(key_code, value, syn=i == last)
+        pending.clear()
+
+
+# 进程级引擎单例：uinput 设备创建要为每个键码做一次 ioctl 并等待 udev，只付一次成本
+# Process-wide engine singleton: creating the uinput device does one ioctl per key code plus a udev settle, so pay that once
+_ENGINE: Optional[KeyboardEngine] = None
+
+
+def get_engine() -> KeyboardEngine:
+    """返回共享的 KeyboardEngine，首次调用时才创建设备 | Return the shared KeyboardEngine, creating the device on first call"""
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = KeyboardEngine()
+    return _ENGINE
 
 
 # ------------------------- 主窗口 -------------------------
@@ -290,26 +544,61 @@ class QingBoard(Gtk.Window):
         self._configure_window()
         self._configure_storage()
 
+        # 单个长期存活的 CSS 提供器，只注册一次；后续更新仅重新加载数据
+        # One long-lived CSS provider registered once; later updates only reload its data
+        self._css_provider = Gtk.CssProvider()
+        Gtk.StyleContext.add_provider_for_screen(
+            self.get_screen(), self._css_provider, Gtk.STYLE_PROVIDER_PRIORITY_USER
+        )
+        self._css_refresh_pending = False  # 合并连续的透明度调整 | Coalesce rapid opacity adjustments
+
         # ---------- 触控相关 ----------
         # Touch related
         self.touch_states: Dict[Union[int, Gdk.EventSequence], TouchState] = {}  # 触摸点 ID -> TouchState | Touch point ID -> TouchState
-        self.key_rects: List[Tuple[int, Gdk.Rectangle]] = []   # (key_code, rect) 列表，用于命中测试 | List of (key_code, rect) for hit testing
+        # (键码, 左, 上, 右, 下) 纯整数元组，命中测试不触碰 GObject 属性
+        # Plain (key_code, left, top, right, bottom) int tuples; hit testing touches no GObject properties
+        self.key_rects: List[Tuple[int, int, int, int, int]] = []
+        # 16px 网格桶索引：命中测试只需检查一个桶里的少数候选，而非线性扫描全部按键
+        # 16 px grid bucket index: hit tests check the few candidates in one bucket instead of scanning every key
+        self._grid_lookup: List[Optional[List[Tuple[int, int, int, int, int]]]] = []
+        self._grid_cols = 0
+        self._grid_rows = 0
+        self._rect_update_pending = False  # 已排队的矩形重建（去抖 size-allocate） | Queued rect rebuild (debounces size-allocate)
+        self._rect_snapshot: List[Tuple[int, int, int, int, int]] = []  # 上次各按键的 (code,x,y,w,h) 快照 | Last (code,x,y,w,h) snapshot per key
         self.key_widgets: Dict[int, Gtk.Widget] = {}           # key_code -> 标签控件（用于视觉反馈） | key_code -> label widget (for visual feedback)
-        self.space_tracking: Dict[Union[int, Gdk.EventSequence], SpaceTrackingState] = {} # 空格拖动状态 | Space drag state per touch point
-        self.repeat_states: Dict[Union[int, Gdk.EventSequence], RepeatState] = {} # 重复状态 per touch point | Repeat state per touch point
-        self.key_press_count: Dict[int, int] = {}               # key_code -> 当前按下的触摸点数量 | key_code -> number of currently pressed touch points
+        # Python 侧记录哪些键挂着 pressed 样式类，状态未变时完全不碰样式上下文
+        # Python-side record of which keys carry the 'pressed' class; unchanged state never touches the style context
+        self._visual_pressed: Set[int] = set()
+        # 重复与空格拖动状态并入 TouchState，事件处理只需一次触摸点字典查找
+        # Repeat and space-drag state live on TouchState, so event handling needs one touch-dict lookup
+        self._repeat_pump_source: Optional[int] = None  # 共享的重复泵定时器 | Shared repeat pump timer
+        # 闪烁恢复共用一个定时器：(到期时刻, 键码) 按时间有序入队
+        # Flash restores share one timer: (deadline, key code) entries queued in time order
+        self._flash_queue: List[Tuple[float, int]] = []
+        self._flash_source: Optional[int] = None
+        # key_code -> 是否为修饰键；整型字典查找比集合成员测试更快且避免全局加载
+        # key_code -> is modifier; dict[int] lookup beats set membership and avoids a global load
+        self._is_modifier: Dict[int, bool] = {code: code in MODIFIER_KEYS for code in KEY_MAPPING}
 
         # ---------- 引擎与修饰键 ----------
         # Engine and modifiers
-        self.engine = KeyboardEngine()
-        self.modifiers: Dict[int, ModifierState] = {key: ModifierState() for key in MODIFIER_KEYS}
+        self.engine = get_engine()
+        # 修饰键状态按 _MOD_INDEX 序号存入并行布尔数组，迭代/检查时无需追逐堆对象
+        # Modifier state is kept in parallel bool arrays indexed by _MOD_INDEX, so checks chase no heap objects
+        self._mod_pressed: List[bool] = [False] * len(_MOD_INDEX)     # 是否有物理按下 | Physically pressed
+        self._mod_latched: List[bool] = [False] * len(_MOD_INDEX)     # 是否处于锁存状态 | Latched (after a single tap)
+        self._mod_used_combo: List[bool] = [False] * len(_MOD_INDEX)  # 是否在组合键中被使用 | Used in a combination
+        self._pressed_modifiers: Set[int] = set()  # 当前物理按下的修饰键序号（热路径快速扫描用） | Ordinals of currently pressed modifiers (fast scan on hot path)
+        # 锁存且未被按住的修饰键码；每敲一个字母都要查一次，维护小集合胜过扫全部修饰键
+        # Key codes latched but not physically held; checked after every letter, so a maintained small set beats scanning all modifiers
+        self._latched_oneshot: Set[int] = set()
         self.modifier_labels: Dict[int, Gtk.Widget] = {}       # 修饰键标签（快速视觉反馈） | Modifier key labels (for quick visual feedback)
         self.caps_indicator_button: Optional[Gtk.Button] = None
         self.regular_labels: Dict[str, Gtk.Widget] = {}        # 普通键标签（用于符号切换） | Regular key labels (for symbol switching)
 
         # ---------- 双 Shift 快捷键 ----------
         # Double‑Shift shortcut
-        self.last_shift_tap_at = 0.0
+        self.last_shift_tap_at = 0  # 上次 Shift 单按的事件时间（毫秒） | Event time of the last Shift tap (milliseconds)
         self.double_shift_timeout_ms = 380
         self.double_shift_shortcut_enabled = True
         self.double_shift_shortcut = [uinput.KEY_LEFTSHIFT, uinput.KEY_SPACE]
@@ -317,12 +606,16 @@ class QingBoard(Gtk.Window):
         # ---------- 配置参数 ----------
         # Configuration parameters
         self.theme_name = "Dark"
+        self._theme_colors = THEMES["Dark"]  # 当前主题的颜色表（随主题切换更新） | Color table of the active theme (updated on theme change)
         self.opacity = "0.96"
         self.font_size = 18
         self.width = 0
         self.height = 0
         self.capslock_on = False
         self.space_long_press_ms = 300
+        self._settings_dirty = False  # 有未保存的设置变更时为 True | True when there are unsaved setting changes
+        self._save_source: Optional[int] = None  # 去抖的延迟保存定时器 | Debounced deferred-save timer
+        self._resize_pending = False  # 已排队的尺寸采样（合并 configure-event 洪水） | Queued size sampling (coalesces the configure-event flood)
 
         # 加载设置并构建 UI
         # Load settings and build UI
@@ -370,7 +663,7 @@ class QingBoard(Gtk.Window):
         """设置配置文件路径 | Set configuration file path"""
         self.config_dir = os.path.expanduser("~/.config/qingboard")
         self.config_file = os.path.join(self.config_dir, "settings.conf")
-        self.config = configparser.ConfigParser()
+        self._config_mtime = 0.0  # 上次读取时的文件修改时间 | File mtime at the last read
 
     # ------------------------- UI 构建 -------------------------
     # UI building
@@ -417,11 +710,11 @@ class QingBoard(Gtk.Window):
         # Theme selection combobox
         self.theme_combobox = Gtk.ComboBoxText()
         self.theme_combobox.append_text("Theme")
-        for name in THEMES:
+        for name in _THEME_ORDER:
             self.theme_combobox.append_text(name)
-        self.theme_combobox.set_active(0)
-        if self.theme_name in THEMES:
-            self.theme_combobox.set_active(list(THEMES.keys()).index(self.theme_name) + 1)
+        # 第 0 项是占位的 "Theme"，主题序号整体偏移 1；未知主题落回占位项
+        # Entry 0 is the "Theme" placeholder, so theme ordinals shift by 1; unknown themes fall back to the placeholder
+        self.theme_combobox.set_active(_THEME_INDEX.get(self.theme_name, -1) + 1)
         self.theme_combobox.set_name("combobox")
         self.theme_combobox.connect("changed", self.change_theme)
         self.header_controls.pack_start(self.theme_combobox, False, False, 0)
@@ -449,21 +742,14 @@ class QingBoard(Gtk.Window):
         self.grid.set_column_homogeneous(True)
         parent.pack_start(self.grid, True, True, 0)
 
-        # 计算每行的目标宽度，使所有行宽度一致
-        # Calculate target width for each row, making all rows the same width
-        row_widths = [sum(KEY_WIDTHS.get(label, 2) for label in row) for row in DEFAULT_LAYOUT]
-        target_width = max(row_widths)
-
         for row_index, row in enumerate(DEFAULT_LAYOUT):
-            # 调整每行中每个按键的宽度，使总和等于 target_width
-            # Adjust widths of keys in the row so the total equals target_width
-            widths = self._balanced_row_widths(row, target_width)
+            # 行宽均衡结果在导入时已算好，这里直接取用
+            # Balanced row widths were computed at import; just index them here
             col = 0
-            for label, width in zip(row, widths):
-                key_code = LABEL_TO_KEY[label]
-                # 去掉左右后缀（如 "_L"、"_R"）以获得更干净的显示
-                # Strip "_L"/"_R" suffixes for cleaner display
-                shown = label[:-2] if label.endswith("_L") or label.endswith("_R") else label
+            for label, width in zip(row, _BALANCED_ROW_WIDTHS[row_index]):
+                # 从预计算表中读取键码、显示文本与修饰键标记
+                # Read key code, shown text and modifier flag from the precomputed table
+                key_code, shown, _, is_modifier = KEY_INFO[label]
 
                 # 创建标签作为按键的视觉表现（不接收事件）
                 # Create a label as the visual representation of the key (does not receive events)
@@ -473,27 +759,29 @@ class QingBoard(Gtk.Window):
                 label_widget.set_can_focus(False)
                 label_widget.set_size_request(0, 48)  # 设置最小高度，保持布局稳定 | Set minimum height for stable layout
                 label_widget.set_ellipsize(Pango.EllipsizeMode.END)   # 允许文本缩略，支持窗口宽度压缩 | Allow text ellipsizing for window compression
+                label_widget.set_single_line_mode(True)  # 键名永远单行，跳过 Pango 的多行高度计算 | Key captions are always one line; skip Pango's multi-line height pass
                 self.grid.attach(label_widget, col, row_index, width, 1)
                 col += width
 
                 # 记录该按键对应的控件
                 # Record the widget for this key
                 self.key_widgets[key_code] = label_widget
-                if key_code in MODIFIER_KEYS:
+                if is_modifier:
                     self.modifier_labels[key_code] = label_widget
                 else:
                     self.regular_labels[label] = label_widget
 
-    def _balanced_row_widths(self, row: List[str], target_width: int) -> List[int]:
-        """通过将多余宽度分配到前面的按键，使整行宽度达到 target_width | Distribute extra width to earlier keys to reach target_width"""
-        widths = [KEY_WIDTHS.get(label, 2) for label in row]
-        deficit = target_width - sum(widths)
-        idx = 0
-        while deficit > 0 and widths:
-            widths[idx % len(widths)] += 1
-            idx += 1
-            deficit -= 1
-        return widths
+        # 预先计算符号键的更新计划（三个对齐的不可变元组），避免每次按键做字典查找
+        # Precompute the symbol-key update plan (three aligned immutable tuples) so per-keypress dict lookups are avoided
+        plan = [
+            (self.regular_labels[plain], plain, symbol)
+            for plain, symbol in SYMBOL_LABELS.items()
+            if plain in self.regular_labels
+        ]
+        self._sym_widgets = tuple(entry[0] for entry in plan)
+        self._sym_plain = tuple(entry[1] for entry in plan)
+        self._sym_symbols = tuple(entry[2] for entry in plan)
+        self._last_shift_active = False
 
     # ------------------------- 触控事件处理 -------------------------
     # Touch event handling
@@ -501,34 +789,69 @@ class QingBoard(Gtk.Window):
 
     def _on_size_allocate(self, widget, allocation):
         """窗口尺寸变化时，延迟更新按键区域矩形（等待布局稳定） | Delay updating key rects after size allocation (wait for layout to settle)"""
-        GLib.idle_add(self._update_key_rects)
+        # 拖动/缩放期间每帧都会分配一次；合并为最多一个待处理的重建
+        # Allocation fires per frame during drags/resizes; coalesce into at most one pending rebuild
+        if self._rect_update_pending:
+            return
+        self._rect_update_pending = True
+        GLib.timeout_add(16, self._update_key_rects)
 
-    def _update_key_rects(self):
+    def _update_key_rects(self) -> bool:
         """重新计算每个按键相对于窗口的坐标矩形 | Recalculate each key's rectangle relative to the window"""
-        self.key_rects.clear()
+        self._rect_update_pending = False
+
+        snapshot = []
         for key_code, widget in self.key_widgets.items():
             alloc = widget.get_allocation()
             res = widget.translate_coordinates(self, 0, 0)
             if res:
-                x, y = res[-2], res[-1]
-                rect = Gdk.Rectangle()
-                rect.x, rect.y, rect.width, rect.height = x, y, alloc.width, alloc.height
-                self.key_rects.append((key_code, rect))
+                snapshot.append((key_code, res[-2], res[-1], alloc.width, alloc.height))
+
+        # 布局未实际变化（如纯移动窗口）时跳过矩形与网格重建
+        # Skip rect and grid rebuilds when the layout didn't actually change (e.g. plain window moves)
+        if snapshot == self._rect_snapshot:
+            return False
+        self._rect_snapshot = snapshot
+
+        # 预先算好右/下边界，命中测试只剩四次整数比较
+        # Precompute right/bottom edges so a hit test is just four int comparisons
+        self.key_rects = [
+            (key_code, x, y, x + width, y + height)
+            for key_code, x, y, width, height in snapshot
+        ]
+        self._rebuild_grid_lookup()
+        return False
+
+    def _rebuild_grid_lookup(self) -> None:
+        """将按键矩形填入 16px 网格桶，供 O(1) 命中测试使用 | Fill key rectangles into 16 px grid buckets for O(1) hit testing"""
+        window_alloc = self.get_allocation()
+        cols = (max(window_alloc.width, 1) >> 4) + 1
+        rows = (max(window_alloc.height, 1) >> 4) + 1
+        grid: List[Optional[List[Tuple[int, int, int, int, int]]]] = [None] * (rows * cols)
+
+        for entry in self.key_rects:
+            _, left, top, right, bottom = entry
+            # 矩形可能跨越多个格子，也可能与相邻键共享边界格，桶内保留候选并精确校验
+            # A rect can span several cells and share boundary cells with neighbours; buckets keep candidates for an exact check
+            for iy in range(max(top, 0) >> 4, min((bottom >> 4) + 1, rows)):
+                base = iy * cols
+                for ix in range(max(left, 0) >> 4, min((right >> 4) + 1, cols)):
+                    bucket = grid[base + ix]
+                    if bucket is None:
+                        bucket = grid[base + ix] = []
+                    bucket.append(entry)
+
+        self._grid_lookup = grid
+        self._grid_cols = cols
+        self._grid_rows = rows
 
     def on_window_event(self, widget, event) -> bool:
         """全局事件处理入口，分发触控/鼠标事件 | Global event handler, dispatches touch/mouse events"""
         etype = event.get_event_type()
 
-        # 只处理我们感兴趣的事件类型
-        # Only handle event types we care about
-        if etype not in (
-            Gdk.EventType.BUTTON_PRESS,
-            Gdk.EventType.BUTTON_RELEASE,
-            Gdk.EventType.TOUCH_BEGIN,
-            Gdk.EventType.TOUCH_END,
-            Gdk.EventType.TOUCH_UPDATE,
-            Gdk.EventType.MOTION_NOTIFY,
-        ):
+        # 只处理我们感兴趣的事件类型（Gdk 枚举是 int 子类，可直接进 int 集合）
+        # Only handle event types we care about (Gdk enums subclass int, so the int sets apply directly)
+        if etype not in _INTERESTING_ETYPES:
             return False
 
         # 获取事件坐标
@@ -541,13 +864,13 @@ class QingBoard(Gtk.Window):
         # 获取触摸点 ID
         # Get touch point ID
         touch_id = MOUSE_TOUCH_ID
-        if etype in (Gdk.EventType.TOUCH_BEGIN, Gdk.EventType.TOUCH_END, Gdk.EventType.TOUCH_UPDATE):
+        if etype in _TOUCH_ETYPES:
             seq = event.sequence
             touch_id = seq if seq is not None else 0
 
         # 根据事件类型分发
         # Dispatch based on event type
-        if etype in (Gdk.EventType.BUTTON_PRESS, Gdk.EventType.TOUCH_BEGIN):
+        if etype in _PRESS_ETYPES:
             key_code = self._find_key_at(win_x, win_y)
             if key_code is None:
                 return False
@@ -560,32 +883,42 @@ class QingBoard(Gtk.Window):
             # Critical: force label update here so that symbols appear immediately when Shift is pressed
             self._update_shift_labels()
 
+            # 本次手势产生的所有按键事件在此一次性提交
+            # All key events produced by this gesture are committed here in one batch
+            self.engine.flush()
             return True
 
-        elif etype in (Gdk.EventType.BUTTON_RELEASE, Gdk.EventType.TOUCH_END):
+        elif etype in _RELEASE_ETYPES:
             # 只有当这个触摸点是我们正在追踪的（起始在按键上），才拦截并处理
             # Only intercept if this touch point is being tracked (started on a key)
             if touch_id in self.touch_states:
                 self._on_input_end(touch_id, event.time)
                 self._update_shift_labels()
+                self.engine.flush()
                 return True
             return False
 
-        elif etype in (Gdk.EventType.TOUCH_UPDATE, Gdk.EventType.MOTION_NOTIFY):
+        else:  # _ET_TOUCH_UPDATE / _ET_MOTION_NOTIFY（前面已过滤其余类型） | remaining interesting types after the filter above
             # 同理，只处理追踪中的滑动事件（比如长按空格后的光标移动）
             # Similarly, only handle motion for tracked touch points (e.g., space cursor movement)
             if touch_id in self.touch_states:
                 self._on_input_update(touch_id, win_x, win_y, event.time)
+                self.engine.flush()
                 return True
             return False
 
-        return False
-
     def _find_key_at(self, x, y) -> Optional[int]:
         """根据窗口坐标查找按键，返回键码 | Find key at given window coordinates, return key code"""
-        for key_code, rect in self.key_rects:
-            if rect.x <= x <= rect.x + rect.width and rect.y <= y <= rect.y + rect.height:
-                return key_code
+        # 属性访问提升为局部变量，每个事件少做几次实例字典查找
+        # Hoist attribute access into locals, saving a few instance-dict lookups per event
+        cols = self._grid_cols
+        ix, iy = int(x) >> 4, int(y) >> 4
+        if 0 <= ix < cols and 0 <= iy < self._grid_rows:
+            bucket = self._grid_lookup[iy * cols + ix]
+            if bucket:
+                for key_code, left, top, right, bottom in bucket:
+                    if left <= x <= right and top <= y <= bottom:
+                        return key_code
         return None
 
     def _on_input_begin(self, touch_id: Union[int, Gdk.EventSequence], x: float, y: float, event_time: int) -> None:
@@ -601,17 +934,17 @@ class QingBoard(Gtk.Window):
 
         # 记录触摸点状态
         # Record touch point state
-        state = TouchState(key_code=key_code, press_time=time.monotonic())
+        # 直接使用 GTK 随事件提供的毫秒时间戳，省去一次时钟系统调用
+        # Use the millisecond timestamp GTK already delivers with the event, saving a clock syscall
+        state = TouchState(key_code=key_code, press_time_ms=event_time)
         self.touch_states[touch_id] = state
 
-        # 更新按键按压计数器
-        # Update press counter for this key
-        self.key_press_count[key_code] = self.key_press_count.get(key_code, 0) + 1
-
         # 特殊按键：CapsLock
         # Special key: CapsLock
         if key_code == uinput.KEY_CAPSLOCK:
             self.capslock_on = not self.capslock_on
+            self._settings_dirty = True
+            self._schedule_save()
             self.engine.tap_key(uinput.KEY_CAPSLOCK)
             self._update_caps_indicator()
             self._flash_regular_key(key_code)
@@ -619,7 +952,7 @@ class QingBoard(Gtk.Window):
 
         # 修饰键
         # Modifier keys
-        if key_code in MODIFIER_KEYS:
+        if self._is_modifier[key_code]:
             self._on_modifier_press_touch(touch_id, key_code)
             self._update_shift_labels()
             return
@@ -627,33 +960,32 @@ class QingBoard(Gtk.Window):
         # 空格键
         # Space key
         if key_code == uinput.KEY_SPACE:
-            for mod_state in self.modifiers.values():
-                if mod_state.pressed:
-                    mod_state.used_in_combo = True
-            self._begin_space_tracking(touch_id)
+            for mod_index in self._pressed_modifiers:
+                self._mod_used_combo[mod_index] = True
+            self._begin_space_tracking(touch_id, state)
             self._update_visual(key_code, True)
             return
 
-        # 普通键
-        # Regular keys
-        for mod_state in self.modifiers.values():
-            if mod_state.pressed:
-                mod_state.used_in_combo = True
+        # 普通键（通常没有修饰键按下，此集合为空，循环零开销）
+        # Regular keys (usually no modifier is down, so this set is empty and the loop is zero work)
+        for mod_index in self._pressed_modifiers:
+            self._mod_used_combo[mod_index] = True
 
         # 当按下新的普通键时，取消所有其他普通键的重复
         # When a new regular key is pressed, cancel repeats of all other regular keys
         self._stop_all_other_repeats(key_code, touch_id)
 
         self.engine.tap_key(key_code)
-        self._start_repeat(touch_id, key_code)
-        if self.key_press_count[key_code] == 1:
-            self._update_visual(key_code, True)
+        self._start_repeat(state)
+        # 若另一触摸点已点亮同键，_update_visual 的本地状态检查会直接返回
+        # If another touch already lit this key, _update_visual's local state check returns immediately
+        self._update_visual(key_code, True)
 
     def _stop_all_other_repeats(self, current_key: int, current_touch: Union[int, Gdk.EventSequence]) -> None:
         """取消所有其他触摸点上的普通键重复 | Cancel repeats on all other touch points that are pressing regular keys"""
-        for tid, state in list(self.touch_states.items()):
-            if tid != current_touch and state.key_code not in MODIFIER_KEYS and state.key_code != uinput.KEY_SPACE:
-                self._cancel_repeat(tid)
+        for tid, state in self.touch_states.items():
+            if tid != current_touch and not self._is_modifier[state.key_code] and state.key_code != uinput.KEY_SPACE:
+                state.repeat_wake_at = 0.0
 
     def _on_input_end(self, touch_id: Union[int, Gdk.EventSequence], event_time: int) -> None:
         """触摸/鼠标释放处理 | Handle touch/mouse release"""
@@ -663,30 +995,24 @@ class QingBoard(Gtk.Window):
 
         key_code = state.key_code
 
-        # 减少计数器
-        # Decrement press counter
-        count = self.key_press_count.get(key_code, 0)
-        if count > 0:
-            new_count = count - 1
-            self.key_press_count[key_code] = new_count
-        else:
-            new_count = 0
-
         if key_code == uinput.KEY_CAPSLOCK:
             return
 
-        if key_code in MODIFIER_KEYS:
-            self._on_modifier_release_touch(touch_id, key_code)
+        if self._is_modifier[key_code]:
+            self._on_modifier_release_touch(key_code, event_time)
         elif key_code == uinput.KEY_SPACE:
-            self._finish_space_tracking(touch_id)
+            self._finish_space_tracking(state)
             self._release_one_shot_modifiers()
             self._update_shift_labels()
             self._update_visual(key_code, False)
         else:
-            self._cancel_repeat(touch_id)
+            # 触摸点状态已弹出，重复泵不会再看到它，无需显式取消
+            # The touch state is already popped, so the repeat pump won't see it; no explicit cancel needed
             self._release_one_shot_modifiers()
             self._update_shift_labels()
-            if new_count == 0:
+            # 该触摸点已弹出；扫描剩余几个触摸点比维护一个计数字典还便宜
+            # This touch is already popped; scanning the few remaining touches beats maintaining a counter dict
+            if not any(s.key_code == key_code for s in self.touch_states.values()):
                 self._update_visual(key_code, False)
 
     def _on_input_update(self, touch_id: Union[int, Gdk.EventSequence], x: float, y: float, event_time: int) -> None:
@@ -696,7 +1022,7 @@ class QingBoard(Gtk.Window):
             return
 
         if state.key_code == uinput.KEY_SPACE:
-            self._on_space_motion_touch(touch_id, x, y, event_time)
+            self._on_space_motion_touch(state, x, y, event_time)
 
     # ------------------------- 视觉反馈 -------------------------
     # Visual feedback
@@ -704,41 +1030,65 @@ class QingBoard(Gtk.Window):
 
     def _update_visual(self, key_code: int, pressed: bool) -> None:
         """更新指定按键的 pressed 样式类 | Update the 'pressed' style class for a key"""
+        # 先查本地集合；命中说明状态已正确，无需任何 GTK 调用
+        # Check the local set first; a match means the state is already correct and no GTK call is needed
+        if pressed == (key_code in self._visual_pressed):
+            return
         widget = self.key_widgets.get(key_code)
         if widget:
-            style = widget.get_style_context()
             if pressed:
-                style.add_class("pressed")
+                self._visual_pressed.add(key_code)
+                widget.get_style_context().add_class("pressed")
             else:
-                style.remove_class("pressed")
+                self._visual_pressed.discard(key_code)
+                widget.get_style_context().remove_class("pressed")
 
     def _flash_regular_key(self, key_code: int) -> None:
         """让普通键闪烁一下 | Briefly flash a regular key"""
         self._update_visual(key_code, True)
-
-        def _clear() -> bool:
-            self._update_visual(key_code, False)
-            return False
-
-        GLib.timeout_add(110, _clear)
+        # 固定 110ms 时长保证队列天然按到期时刻有序；只有队列为空时才新建定时器
+        # The fixed 110 ms duration keeps the queue naturally deadline-ordered; a timer is created only when the queue was empty
+        self._flash_queue.append((time.monotonic() + 0.110, key_code))
+        if self._flash_source is None:
+            self._flash_source = GLib.timeout_add(110, self._flush_flashes)
+
+    def _flush_flashes(self) -> bool:
+        """恢复所有到期的闪烁键，并为剩余项重排定时器 | Restore all expired flashes and rearm the timer for the rest"""
+        queue = self._flash_queue
+        now = time.monotonic() + 0.005  # 容忍少量定时器抖动 | Tolerate a little timer jitter
+        while queue and queue[0][0] <= now:
+            self._update_visual(queue.pop(0)[1], False)
+        if queue:
+            delay_ms = max(int((queue[0][0] - now) * 1000), 1)
+            self._flash_source = GLib.timeout_add(delay_ms, self._flush_flashes)
+        else:
+            self._flash_source = None
+        return False
 
     def _paint_modifier(self, key_code: int, active: bool) -> None:
         """专门更新修饰键的 pressed 样式 | Update 'pressed' style for a modifier key"""
-        widget = self.modifier_labels.get(key_code)
-        if widget:
-            style = widget.get_style_context()
-            if active:
-                style.add_class("pressed")
-            else:
-                style.remove_class("pressed")
+        # 修饰键控件与 key_widgets 中的是同一个对象，直接复用通用路径及其状态缓存
+        # Modifier widgets are the same objects as in key_widgets, so reuse the generic path and its state cache
+        self._update_visual(key_code, active)
 
     def _update_shift_labels(self) -> None:
         """根据 Shift 状态切换符号键的显示 | Update symbol key labels based on Shift state"""
-        shift_active = any(self.modifiers[k].pressed or self.modifiers[k].latched for k in SHIFT_KEYS)
-        for plain, symbol in SYMBOL_LABELS.items():
-            widget = self.regular_labels.get(plain)
-            if widget:
-                widget.set_label(symbol if shift_active else plain)
+        # 直接读取两个 Shift 序号的数组槽位，无字典查找、无生成器开销
+        # Read the two Shift array slots directly: no dict lookup, no generator overhead
+        shift_active = (
+            self._mod_pressed[_SHIFT_L_IDX]
+            or self._mod_latched[_SHIFT_L_IDX]
+            or self._mod_pressed[_SHIFT_R_IDX]
+            or self._mod_latched[_SHIFT_R_IDX]
+        )
+        # 状态未变化时直接返回，省掉约 20 次标签写入
+        # Early return when state is unchanged, skipping ~20 label writes
+        if shift_active == self._last_shift_active:
+            return
+        self._last_shift_active = shift_active
+        labels = self._sym_symbols if shift_active else self._sym_plain
+        for widget, label in zip(self._sym_widgets, labels):
+            widget.set_label(label)
 
     def _set_space_cursor_visual(self, touch_id: Union[int, Gdk.EventSequence], active: bool) -> None:
         """更新空格键的视觉样式（光标模式） | Update visual style of the Space key (cursor mode)"""
@@ -770,14 +1120,18 @@ class QingBoard(Gtk.Window):
 
     def _on_modifier_press_touch(self, touch_id: Union[int, Gdk.EventSequence], key_code: int) -> None:
         """触摸点按下修饰键时的处理 | Handle modifier press for a touch point"""
-        if not self.modifiers[key_code].pressed:
+        if not self._mod_pressed[_MOD_INDEX[key_code]]:
             self._on_modifier_press_global(key_code)
 
     def _on_modifier_press_global(self, key_code: int) -> None:
         """全局修饰键按下 | Global modifier press"""
-        state = self.modifiers[key_code]
-        state.pressed = True
-        state.used_in_combo = False
+        index = _MOD_INDEX[key_code]
+        self._mod_pressed[index] = True
+        self._mod_used_combo[index] = False
+        self._pressed_modifiers.add(index)
+        # 被重新按住的锁存键不再是「一次性」状态
+        # A latched key pressed again is no longer in the one-shot state
+        self._latched_oneshot.discard(key_code)
 
         if key_code in SHIFT_KEYS:
             opposite = uinput.KEY_RIGHTSHIFT if key_code == uinput.KEY_LEFTSHIFT else uinput.KEY_LEFTSHIFT
@@ -786,173 +1140,193 @@ class QingBoard(Gtk.Window):
         self.engine.set_key_state(key_code, True)
         self._paint_modifier(key_code, True)
 
-    def _on_modifier_release_touch(self, touch_id: Union[int, Gdk.EventSequence], key_code: int) -> None:
+    def _on_modifier_release_touch(self, key_code: int, event_time: int) -> None:
         """触摸点释放修饰键时的处理 | Handle modifier release for a touch point"""
-        still_pressed = any(
-            s.key_code == key_code for tid, s in self.touch_states.items() if tid != touch_id
-        )
+        # 调用方已把本触摸点弹出，直接扫描余下的触摸点即可
+        # The caller already popped this touch, so scanning the remaining ones suffices
+        still_pressed = any(s.key_code == key_code for s in self.touch_states.values())
         if not still_pressed:
-            self._on_modifier_release_global(key_code)
+            self._on_modifier_release_global(key_code, event_time)
 
-    def _on_modifier_release_global(self, key_code: int) -> None:
+    def _on_modifier_release_global(self, key_code: int, event_time: int) -> None:
         """全局修饰键释放 | Global modifier release"""
-        state = self.modifiers[key_code]
-        state.pressed = False
+        index = _MOD_INDEX[key_code]
+        self._mod_pressed[index] = False
+        self._pressed_modifiers.discard(index)
 
-        if state.used_in_combo:
-            if not state.latched:
+        if self._mod_used_combo[index]:
+            if not self._mod_latched[index]:
                 self.engine.set_key_state(key_code, False)
                 self._paint_modifier(key_code, False)
-            state.used_in_combo = False
+            else:
+                # 锁存在手指抬起后继续生效，重新进入一次性释放集合
+                # The latch stays in effect after the finger lifts, so it re-enters the one-shot set
+                self._latched_oneshot.add(key_code)
+            self._mod_used_combo[index] = False
             return
 
-        if state.latched:
-            state.latched = False
+        if self._mod_latched[index]:
+            self._mod_latched[index] = False
+            self._latched_oneshot.discard(key_code)
             self.engine.set_key_state(key_code, False)
             self._paint_modifier(key_code, False)
         else:
-            state.latched = True
+            self._mod_latched[index] = True
+            self._latched_oneshot.add(key_code)
             self._paint_modifier(key_code, True)
 
         if key_code in SHIFT_KEYS:
-            self._handle_shift_double_tap()
+            self._handle_shift_double_tap(event_time)
 
     def _force_release_modifier(self, key_code: int) -> None:
         """强制释放某个修饰键 | Force‑release a modifier key"""
-        state = self.modifiers[key_code]
-        state.pressed = False
-        state.latched = False
-        state.used_in_combo = False
+        index = _MOD_INDEX[key_code]
+        self._mod_pressed[index] = False
+        self._mod_latched[index] = False
+        self._mod_used_combo[index] = False
+        self._pressed_modifiers.discard(index)
+        self._latched_oneshot.discard(key_code)
         self.engine.set_key_state(key_code, False)
         self._paint_modifier(key_code, False)
 
     def _release_one_shot_modifiers(self) -> None:
         """释放所有锁存但未被按住的修饰键 | Release all latched modifiers that are not physically pressed"""
-        for key_code, state in self.modifiers.items():
-            if state.latched and not state.pressed:
-                state.latched = False
-                self.engine.set_key_state(key_code, False)
-                self._paint_modifier(key_code, False)
+        # 集合随锁存状态同步维护；通常为空，这里立即返回
+        # The set is maintained alongside the latch state; it is usually empty and this returns immediately
+        latched = self._latched_oneshot
+        if not latched:
+            return
+        for key_code in latched:
+            self._mod_latched[_MOD_INDEX[key_code]] = False
+            self.engine.set_key_state(key_code, False)
+            self._paint_modifier(key_code, False)
+        latched.clear()
 
-    def _handle_shift_double_tap(self) -> None:
+    def _handle_shift_double_tap(self, event_time: int) -> None:
         """检测 Shift 双按，触发预设快捷键 | Detect double‑tap of Shift and trigger the configured shortcut"""
         if not self.double_shift_shortcut_enabled:
-            self.last_shift_tap_at = 0.0
+            self.last_shift_tap_at = 0
             return
 
-        now = time.monotonic()
-        elapsed_ms = (now - self.last_shift_tap_at) * 1000
-        if self.last_shift_tap_at > 0 and elapsed_ms <= self.double_shift_timeout_ms:
+        # 双按检测直接用事件自带的毫秒时钟比较，无需读取系统时钟
+        # Double-tap detection compares the event's own millisecond clock, no system clock read needed
+        if self.last_shift_tap_at > 0 and event_time - self.last_shift_tap_at <= self.double_shift_timeout_ms:
+            # 只强制释放确实处于按下或锁存状态的 Shift，未动过的那侧不做任何事
+            # Only force-release a Shift that is actually pressed or latched; the untouched side does nothing
             for shift_key in SHIFT_KEYS:
-                self._force_release_modifier(shift_key)
+                index = _MOD_INDEX[shift_key]
+                if self._mod_pressed[index] or self._mod_latched[index]:
+                    self._force_release_modifier(shift_key)
             self._emit_shortcut(self.double_shift_shortcut)
-            self.last_shift_tap_at = 0.0
+            self.last_shift_tap_at = 0
             return
-        self.last_shift_tap_at = now
+        self.last_shift_tap_at = event_time
 
     def _emit_shortcut(self, combo: List[int]) -> None:
         """发送组合键 | Emit a key combination"""
-        mods = [code for code in combo if code in MODIFIER_KEYS]
-        normals = [code for code in combo if code not in MODIFIER_KEYS]
-
-        for key in mods:
-            self.engine.set_key_state(key, True)
-        if normals:
-            for key in normals:
-                self.engine.tap_key(key)
-        else:
-            for key in mods:
-                self.engine.tap_key(key)
-        for key in reversed(mods):
-            self.engine.set_key_state(key, False)
+        if not combo:
+            return
+        # 常见情况（双 Shift 快捷键为「修饰键 + 普通键」两键）直接发送，不分配任何列表
+        # Common case (the double-shift shortcut is a two-key modifier + regular pair): emit directly, no list allocation
+        if len(combo) == 2 and combo[0] in MODIFIER_KEYS and combo[1] not in MODIFIER_KEYS:
+            self.engine.emit_combo(combo)
+            self.engine.flush()
+            return
+        # 一趟遍历拆分修饰键与普通键，每个键码只做一次集合成员测试
+        # Split modifiers from regular keys in one pass, one set-membership test per key code
+        mods: List[int] = []
+        normals: List[int] = []
+        for code in combo:
+            (mods if code in MODIFIER_KEYS else normals).append(code)
+        # 修饰键在前、普通键在后，整个组合只触发一次内核同步
+        # Modifiers first, regular keys after; the whole combo costs a single kernel syn
+        self.engine.emit_combo(mods + normals)
+        self.engine.flush()
 
     # ------------------------- 按键重复 -------------------------
     # Key repeat
     # -------------------------
 
-    def _start_repeat(self, touch_id: Union[int, Gdk.EventSequence], key_code: int) -> None:
-        """启动按键重复（仅普通键） | Start key repeat (regular keys only)"""
-        if key_code in MODIFIER_KEYS or key_code == uinput.KEY_SPACE:
-            return
-        self._cancel_repeat(touch_id)
-        state = RepeatState()
-        state.delay_source = GLib.timeout_add(420, self._repeat_delay_done, touch_id, key_code)
-        self.repeat_states[touch_id] = state
-
-    def _repeat_delay_done(self, touch_id: Union[int, Gdk.EventSequence], key_code: int) -> bool:
-        """延迟结束，开始周期性重复 | Delay finished, start periodic repeats"""
-        if touch_id not in self.touch_states or self.touch_states[touch_id].key_code != key_code:
-            return False
-        state = self.repeat_states.get(touch_id)
-        if state is None:
-            return False
-        state.repeat_source = GLib.timeout_add(70, self._repeat_tick, touch_id, key_code)
-        state.delay_source = None
-        return False
+    def _start_repeat(self, state: TouchState) -> None:
+        """启动按键重复（仅普通键；调用方已排除修饰键与空格） | Start key repeat (regular keys only; callers already filter modifiers and Space)"""
+        state.repeat_wake_at = time.monotonic() + 0.420
+        if self._repeat_pump_source is None:
+            # 10ms 轮询只在有键重复时运行，把 70ms 重复间隔的抖动压到一个 tick 以内
+            # The 10 ms poll runs only while keys repeat, keeping jitter on the 70 ms repeat interval under one tick
+            self._repeat_pump_source = GLib.timeout_add(10, self._repeat_pump)
+
+    def _repeat_pump(self) -> bool:
+        """共享的重复泵：到期的键发送一次点击并顺延 | Shared repeat pump: tap keys whose deadline passed and reschedule them"""
+        # 把热循环中要用的引用绑定为局部变量，单次唤醒服务所有重复中的键
+        # Bind hot-loop references to locals; a single wakeup services every repeating key
+        tap = self.engine.tap_key
+        now = time.monotonic()
 
-    def _repeat_tick(self, touch_id: Union[int, Gdk.EventSequence], key_code: int) -> bool:
-        """重复周期触发，发送一次按键 | Repeat tick, send one key tap"""
-        if touch_id not in self.touch_states or self.touch_states[touch_id].key_code != key_code:
-            self._cancel_repeat(touch_id)
+        active = False
+        for state in self.touch_states.values():
+            wake_at = state.repeat_wake_at
+            if wake_at > 0.0:
+                active = True
+                if now >= wake_at:
+                    tap(state.key_code)
+                    state.repeat_wake_at = now + 0.070
+        self.engine.flush()
+
+        if not active:
+            self._repeat_pump_source = None
             return False
-        self.engine.tap_key(key_code)
         return True
 
-    def _cancel_repeat(self, touch_id: Union[int, Gdk.EventSequence]) -> None:
-        """取消指定触摸点的重复 | Cancel repeat for the given touch point"""
-        state = self.repeat_states.pop(touch_id, None)
-        if state is None:
-            return
-        if state.delay_source:
-            GLib.source_remove(state.delay_source)
-        if state.repeat_source:
-            GLib.source_remove(state.repeat_source)
-
     # ------------------------- 空格拖动 -------------------------
     # Space dragging (cursor mode)
     # -------------------------
 
-    def _begin_space_tracking(self, touch_id: Union[int, Gdk.EventSequence]) -> None:
+    def _begin_space_tracking(self, touch_id: Union[int, Gdk.EventSequence], state: TouchState) -> None:
         """开始跟踪空格键的按下 | Start tracking a space press"""
-        self._cancel_space_long_press(touch_id)
         tracking = SpaceTrackingState()
         tracking.long_press_source = GLib.timeout_add(
             self.space_long_press_ms, self._enter_space_cursor_mode, touch_id
         )
-        self.space_tracking[touch_id] = tracking
+        state.space = tracking
 
-    def _finish_space_tracking(self, touch_id: Union[int, Gdk.EventSequence]) -> None:
+    def _finish_space_tracking(self, state: TouchState) -> None:
         """结束空格键的跟踪 | Finish tracking a space press"""
-        tracking = self.space_tracking.pop(touch_id, None)
+        tracking = state.space
         if tracking is None:
             self.engine.tap_key(uinput.KEY_SPACE)
             return
 
-        self._cancel_space_long_press(touch_id)
+        state.space = None
+        self._cancel_space_long_press(tracking)
+        if tracking.cursor_pump_source is not None:
+            GLib.source_remove(tracking.cursor_pump_source)
+            tracking.cursor_pump_source = None
         if not tracking.cursor_mode:
             self.engine.tap_key(uinput.KEY_SPACE)
 
-    def _cancel_space_long_press(self, touch_id: Union[int, Gdk.EventSequence]) -> None:
+    @staticmethod
+    def _cancel_space_long_press(tracking: SpaceTrackingState) -> None:
         """取消空格的长按定时器 | Cancel the space long‑press timer"""
-        tracking = self.space_tracking.get(touch_id)
-        if tracking and tracking.long_press_source is not None:
+        if tracking.long_press_source is not None:
             GLib.source_remove(tracking.long_press_source)
             tracking.long_press_source = None
 
     def _enter_space_cursor_mode(self, touch_id: Union[int, Gdk.EventSequence]) -> bool:
         """长按超时，进入光标模式 | Long‑press timeout, enter cursor mode"""
-        if touch_id not in self.touch_states or self.touch_states[touch_id].key_code != uinput.KEY_SPACE:
-            return False
-        tracking = self.space_tracking.get(touch_id)
-        if tracking is None:
+        state = self.touch_states.get(touch_id)
+        if state is None or state.key_code != uinput.KEY_SPACE or state.space is None:
             return False
-        tracking.cursor_mode = True
+        state.space.cursor_mode = True
+        state.space.long_press_source = None  # 一次性定时器已触发，GLib 会自行移除 | One-shot timer fired; GLib removes it itself
+        # 采样与发射分离：移动事件只累积位移，方向键由 60Hz 泵按帧批量发出
+        # Sampling and emission are split: motion events only accumulate deltas, arrows are emitted in per-frame batches by a 60 Hz pump
+        state.space.cursor_pump_source = GLib.timeout_add(16, self._cursor_pump, touch_id)
         self._set_space_cursor_visual(touch_id, True)
         return False
 
-    def _on_space_motion_touch(self, touch_id: Union[int, Gdk.EventSequence], x: float, y: float, event_time: int) -> None:
-        """空格移动事件处理 | Handle space motion events"""
-        tracking = self.space_tracking.get(touch_id)
+    def _on_space_motion_touch(self, state: TouchState, x: float, y: float, event_time: int) -> None:
+        """空格移动事件处理：只做位移累积 | Handle space motion events: accumulation only"""
+        tracking = state.space
         if tracking is None or not tracking.cursor_mode:
             return
 
@@ -964,162 +1338,100 @@ class QingBoard(Gtk.Window):
 
         dx = x - tracking.last_x
         dy = y - tracking.last_y
-        dt = max((event_time / 1000.0) - tracking.last_motion_at, 0.001)
         tracking.last_x = x
         tracking.last_y = y
         tracking.last_motion_at = event_time / 1000.0
 
-        tracking.accum_x += dx
-        tracking.accum_y += dy
-        speed = ((dx * dx + dy * dy) ** 0.5) / dt
+        # 累积用 ×256 定点整数，消费端 divmod 一步取整取余，且无浮点漂移
+        # Accumulate in x256 fixed-point ints; the consumer gets steps and remainder in one divmod, with no float drift
+        tracking.accum_x += int(dx * 256)
+        tracking.accum_y += int(dy * 256)
+        tracking.frame_dist += math.hypot(dx, dy)
+
+    def _cursor_pump(self, touch_id: Union[int, Gdk.EventSequence]) -> bool:
+        """每帧一次：按本帧移动速度计算步长并批量发送方向键 | Once per frame: derive the step threshold from this frame's speed and emit arrows in a batch"""
+        state = self.touch_states.get(touch_id)
+        if state is None or state.space is None or not state.space.cursor_mode:
+            return False
+        tracking = state.space
+        # 帧距折算为速度（泵周期 16ms），阈值逻辑与原先逐事件计算一致
+        # Frame distance converts to speed over the 16 ms pump period; the threshold logic matches the old per-event computation
+        speed = tracking.frame_dist * 62.5
+        tracking.frame_dist = 0.0
         step_threshold = max(8.0, 28.0 - min(speed / 120.0, 16.0))
         self._emit_cursor_moves(tracking, step_threshold)
+        self.engine.flush()
+        return True
 
     def _emit_cursor_moves(self, tracking: SpaceTrackingState, step_threshold: float) -> None:
         """根据累积位移发送方向键 | Emit arrow keys based on accumulated displacement"""
+        # 阈值换算到同一 ×256 定点刻度；divmod 同时得到步数和余数
+        # Convert the threshold to the same x256 fixed-point scale; divmod yields steps and remainder together
+        threshold = int(step_threshold * 256)
         if abs(tracking.accum_x) >= abs(tracking.accum_y):
-            steps = int(abs(tracking.accum_x) / step_threshold)
+            steps, remainder = divmod(abs(tracking.accum_x), threshold)
             if steps > 0:
                 key = uinput.KEY_RIGHT if tracking.accum_x > 0 else uinput.KEY_LEFT
-                for _ in range(steps):
-                    self.engine.tap_key(key)
-                tracking.accum_x -= step_threshold * steps if tracking.accum_x > 0 else -step_threshold * steps
-                tracking.accum_y = 0.0
+                self.engine.tap_key_n(key, steps)
+                tracking.accum_x = remainder if tracking.accum_x > 0 else -remainder
+                tracking.accum_y = 0
         else:
-            steps = int(abs(tracking.accum_y) / step_threshold)
+            steps, remainder = divmod(abs(tracking.accum_y), threshold)
             if steps > 0:
                 key = uinput.KEY_DOWN if tracking.accum_y > 0 else uinput.KEY_UP
-                for _ in range(steps):
-                    self.engine.tap_key(key)
-                tracking.accum_y -= step_threshold * steps if tracking.accum_y > 0 else -step_threshold * steps
-                tracking.accum_x = 0.0
+                self.engine.tap_key_n(key, steps)
+                tracking.accum_y = remainder if tracking.accum_y > 0 else -remainder
+                tracking.accum_x = 0
 
     # ------------------------- 窗口管理 -------------------------
     # Window management
     # -------------------------
 
     def _on_window_realize(self, *_args) -> None:
-        """窗口实现后，尝试置顶 | Try to raise window after realization"""
+        """窗口实现后，尝试置顶并关闭事件压缩 | After realization, raise the window and disable event compression"""
+        gdk_window = self.get_window()
+        if gdk_window is not None:
+            # 关闭 GDK 每帧一次的移动事件压缩，空格光标模式能拿到全部采样点；
+            # 累积位移阈值保证快速滑动时 CPU 开销仍然有界
+            # Disable GDK's per-frame motion compression so space-cursor mode sees every sample;
+            # the accumulated-delta threshold keeps CPU cost bounded under fast strokes
+            gdk_window.set_event_compression(False)
         self._raise_window_topmost()
+        # 再补一次置顶以压过窗口管理器迟来的重排，然后不再定时唤醒
+        # Raise once more to beat any late restacking by the window manager, then never wake on a timer again
         GLib.timeout_add(1500, self._raise_window_topmost)
 
     def _raise_window_topmost(self) -> bool:
-        """将窗口置顶 | Raise window to top"""
+        """将窗口置顶（一次性，不自我重复） | Raise window to top (one-shot, does not reschedule itself)"""
         self.set_keep_above(True)
         self.stick()
         gdk_window = self.get_window()
         if gdk_window is not None:
             gdk_window.raise_()
-        return True
+        return False
 
     # ------------------------- 主题与样式 -------------------------
     # Theme and styling
     # -------------------------
 
-    def _theme(self) -> Dict[str, str]:
-        """返回当前主题的字典 | Return the current theme dictionary"""
-        return THEMES.get(self.theme_name, THEMES["Dark"])
-
     def apply_css(self) -> None:
         """应用CSS样式 | Apply CSS styling"""
-        theme = self._theme()
         self.set_opacity(float(self.opacity))
-        provider = Gtk.CssProvider()
-
-        css = f"""
-        #toplevel {{ background-color: rgb({theme['bg']}); }}
-        #root {{ background-color: rgb({theme['bg']}); margin: 0; padding: 0; }}
-        headerbar {{
-            background-color: rgb({theme['bg']});
-            border: 0;
-            box-shadow: none;
-            min-height: 54px;
-        }}
-        headerbar button {{
-            background-image: none;
-            background-color: rgb({theme['key']});
-            border: 1px solid rgb({theme['key_border']});
-            min-height: 46px;
-            min-width: 0;                      /* 允许按钮宽度压缩，配合窗口宽度调整 | Allow button width to compress */
-            border-radius: 8px;
-            margin: 4px 0;
-        }}
-        headerbar button:disabled {{
-            background-image: none;
-            background-color: rgb({theme['key']});
-            border: 1px solid rgb({theme['key_border']});
-        }}
-        headerbar .titlebutton {{
-            min-width: 56px;
-            min-height: 46px;
-            background-color: rgb({theme['key']});
-        }}
-        #combobox button.combo {{
-            background-image: none;
-            background-color: rgb({theme['key']});
-            border: 1px solid rgb({theme['key_border']});
-            min-height: 46px;
-            min-width: 90px;
-            border-radius: 8px;
-        }}
-        headerbar button label, #combobox button.combo label {{
-            color: {theme['text']};
-            font-size: {max(self.font_size - 1, 12)}px;
-            font-weight: 600;
-        }}
-        #grid {{ margin: 0; padding: 0; }}
-        .key-button {{
-            border-radius: 8px;
-            border: 1px solid rgb({theme['key_border']});
-            background-image: none;
-            background-color: rgb({theme['key']});
-            box-shadow: none;
-            outline: none;
-            min-height: 48px;
-            min-width: 0;      /* 允许按键宽度压缩，支持窗口缩小 | Allow key width to compress */
-            margin: 0;
-            padding: 0;
-            color: {theme['text']};
-            font-weight: 600;
-            font-size: {self.font_size}px;
-        }}
-        #caps-indicator {{
-            background-image: none;
-            background-color: rgb({theme['key']});
-            border: 1px solid rgb({theme['key_border']});
-            border-radius: 8px;
-            min-height: 46px;
-            min-width: 85px;
-            margin: 4px 0;
-            padding: 0 8px;
-            color: {theme['text']};
-            font-size: {max(self.font_size - 2, 11)}px;
-            font-weight: 700;
-        }}
-        #caps-indicator.caps-on {{
-            color: rgba({theme['accent']}, 1.0);
-        }}
-        #caps-indicator.caps-on label {{
-            color: rgba({theme['accent']}, 1.0);
-        }}
-        .key-button.pressed,
-        .key-button.pressed:hover,
-        .key-button.pressed:focus,
-        .key-button.pressed:active {{
-            background-color: rgba({theme['accent']}, 0.28);
-            border-color: rgba({theme['accent']}, 1.0);
-        }}
-        .key-button.cursor-mode {{
-            background-color: rgba({theme['accent']}, 0.24);
-            border-color: rgba({theme['accent']}, 1.0);
-        }}
-        .key-button.cursor-mode label {{
-            color: rgba({theme['accent']}, 1.0);
-            font-weight: 700;
-        }}
-        """
-        provider.load_from_data(css.encode("utf-8"))
-        Gtk.StyleContext.add_provider_for_screen(self.get_screen(), provider, Gtk.STYLE_PROVIDER_PRIORITY_USER)
+        # 透明度走 set_opacity，不进缓存键；字节串由模块级 lru_cache 持有
+        # Opacity goes through set_opacity and stays out of the cache key; the byte strings live in a module-level lru_cache
+        self._css_provider.load_from_data(_build_css_bytes(self.theme_name, self.font_size))
+
+    def _flush_css(self) -> bool:
+        """空闲时重建一次 CSS，将连续的调整合并为一次重载 | Rebuild CSS once at idle, merging a burst of adjustments into one reload"""
+        self._css_refresh_pending = False
+        self.apply_css()
+        return False
+
+    def _schedule_css_refresh(self) -> None:
+        """请求一次延迟的 CSS 重建（若尚未排队） | Request a deferred CSS rebuild (if not already queued)"""
+        if not self._css_refresh_pending:
+            self._css_refresh_pending = True
+            GLib.idle_add(self._flush_css)
 
     # ------------------------- 控制功能 -------------------------
     # Control functions
@@ -1134,22 +1446,38 @@ class QingBoard(Gtk.Window):
     def change_opacity(self, _button, increase: bool) -> None:
         """调整窗口透明度 | Adjust window opacity"""
         delta = 0.02 if increase else -0.02
-        self.opacity = str(round(min(1.0, max(0.35, float(self.opacity) + delta)), 2))
-        self.opacity_btn.set_label(self.opacity)
-        self.apply_css()
+        new_opacity = str(round(min(1.0, max(0.35, float(self.opacity) + delta)), 2))
+        # 已钳制到边界时值不再变化，按住按钮也不触发任何重建
+        # Once clamped at a bound the value stops changing, so holding the button triggers no rebuild at all
+        if new_opacity == self.opacity:
+            return
+        self.opacity = new_opacity
+        self.opacity_btn.set_label(new_opacity)
+        self._settings_dirty = True
+        self._schedule_css_refresh()
+        self._schedule_save()
 
     def change_font_size(self, _button, delta: int) -> None:
         """调整字体大小 | Adjust font size"""
-        self.font_size = min(48, max(10, self.font_size + delta * 2))
-        self.font_btn.set_label(f"{self.font_size}px")
-        self.apply_css()
+        new_size = min(48, max(10, self.font_size + delta * 2))
+        if new_size == self.font_size:
+            return
+        self.font_size = new_size
+        self.font_btn.set_label(f"{new_size}px")
+        self._settings_dirty = True
+        self._schedule_css_refresh()
+        self._schedule_save()
 
     def change_theme(self, _widget) -> None:
         """切换主题 | Change theme"""
         selected = self.theme_combobox.get_active_text()
-        if selected in THEMES:
+        colors = THEMES.get(selected)
+        if colors is not None and selected != self.theme_name:
             self.theme_name = selected
-            self.apply_css()
+            self._theme_colors = colors
+            self._settings_dirty = True
+            self._schedule_css_refresh()
+            self._schedule_save()
 
     # ------------------------- 配置读写 -------------------------
     # Configuration I/O
@@ -1158,53 +1486,60 @@ class QingBoard(Gtk.Window):
     def _parse_shortcut(self, raw: str) -> List[int]:
         """将配置文件中的快捷键字符串解析为键码列表 | Parse a shortcut string from config into a list of key codes"""
         result: List[int] = []
-        for part in raw.split(","):
-            token = part.strip().upper().replace("KEY_", "")
+        # 大写化与去空白对整串各做一趟，逐个标记只剩剥前缀和查表
+        # Uppercasing and whitespace removal sweep the whole string once each; per token only the prefix strip and lookups remain
+        for token in raw.upper().translate(_WS_STRIP).split(","):
+            token = token.removeprefix("KEY_")
             token = CONFIG_TOKEN_ALIASES.get(token, token)
-            key_code = getattr(uinput, f"KEY_{token}", None)
+            key_code = _TOKEN_TO_KEYCODE.get(token)
             if key_code is not None:
                 result.append(key_code)
         return result or [uinput.KEY_LEFTSHIFT, uinput.KEY_SPACE]
 
     def _shortcut_to_config(self, combo: List[int]) -> str:
         """将键码列表转换为配置文件中的字符串 | Convert a list of key codes to a config string"""
-        name_map = {
-            uinput.KEY_LEFTSHIFT: "LEFTSHIFT",
-            uinput.KEY_RIGHTSHIFT: "RIGHTSHIFT",
-            uinput.KEY_LEFTCTRL: "LEFTCTRL",
-            uinput.KEY_RIGHTCTRL: "RIGHTCTRL",
-            uinput.KEY_LEFTALT: "LEFTALT",
-            uinput.KEY_RIGHTALT: "RIGHTALT",
-            uinput.KEY_LEFTMETA: "LEFTMETA",
-            uinput.KEY_RIGHTMETA: "RIGHTMETA",
-            uinput.KEY_SPACE: "SPACE",
-        }
-        return ",".join(name_map.get(key, str(key)) for key in combo)
+        return ",".join(_KEY_CODE_TO_NAME.get(key, str(key)) for key in combo)
+
+    @staticmethod
+    def _coerce_bool(raw: Optional[str], default: bool) -> bool:
+        """将配置字符串转换为布尔值（接受 configparser 的写法） | Convert a config string to bool (accepting configparser spellings)"""
+        if raw is None:
+            return default
+        return _BOOLEAN_STATES.get(raw.lower(), default)
 
     def _load_settings(self) -> None:
         """从配置文件加载设置 | Load settings from config file"""
+        # 配置只是十来个标量键值对，直接逐行拆分；跳过节头和注释即可与旧文件兼容
+        # The config is a dozen scalar key/value pairs, so split lines directly; skipping section headers and comments keeps old files compatible
+        settings: Dict[str, str] = {}
         try:
-            os.makedirs(self.config_dir, exist_ok=True)
-        except PermissionError:
-            return
-
-        if not os.path.exists(self.config_file):
+            # 单次 open 同时完成存在性检查、读取与 mtime 采样，省去额外的 stat
+            # A single open covers the existence check, the read and the mtime sample in one syscall path
+            with open(self.config_file, "r", encoding="utf-8") as fp:
+                for line in fp:
+                    line = line.strip()
+                    if not line or line[0] in "#;[":
+                        continue
+                    key, sep, value = line.partition("=")
+                    if sep:
+                        settings[key.strip().lower()] = value.strip()
+                self._config_mtime = os.fstat(fp.fileno()).st_mtime
+        except (FileNotFoundError, PermissionError, UnicodeDecodeError):
             return
 
         try:
-            self.config.read(self.config_file)
-            self.theme_name = self.config.get("DEFAULT", "theme", fallback=self.theme_name)
-            self.opacity = self.config.get("DEFAULT", "opacity", fallback=self.opacity)
-            self.font_size = self.config.getint("DEFAULT", "font_size", fallback=self.font_size)
-            self.width = self.config.getint("DEFAULT", "width", fallback=0)
-            self.height = self.config.getint("DEFAULT", "height", fallback=0)
-            self.double_shift_shortcut_enabled = self.config.getboolean(
-                "DEFAULT", "double_shift_shortcut_enabled", fallback=self.double_shift_shortcut_enabled
+            self.theme_name = settings.get("theme", self.theme_name)
+            self._theme_colors = THEMES.get(self.theme_name, THEMES["Dark"])
+            self.opacity = settings.get("opacity", self.opacity)
+            self.font_size = int(settings.get("font_size", self.font_size))
+            self.width = int(settings.get("width", 0))
+            self.height = int(settings.get("height", 0))
+            self.double_shift_shortcut_enabled = self._coerce_bool(
+                settings.get("double_shift_shortcut_enabled"), self.double_shift_shortcut_enabled
             )
-            shortcut = self.config.get("DEFAULT", "double_shift_shortcut", fallback="LEFTSHIFT,SPACE")
-            self.double_shift_shortcut = self._parse_shortcut(shortcut)
-            self.capslock_on = self.config.getboolean("DEFAULT", "capslock_on", fallback=self.capslock_on)
-        except configparser.Error:
+            self.double_shift_shortcut = self._parse_shortcut(settings.get("double_shift_shortcut", "LEFTSHIFT,SPACE"))
+            self.capslock_on = self._coerce_bool(settings.get("capslock_on"), self.capslock_on)
+        except ValueError:
             return
 
         self.font_size = min(48, max(10, self.font_size))
@@ -1212,24 +1547,77 @@ class QingBoard(Gtk.Window):
             self.set_default_size(self.width, self.height)
 
     def on_resize(self, *_args) -> None:
-        """窗口大小改变时记录尺寸 | Record window size on resize"""
-        self.width, self.height = self.get_size()
+        """窗口大小改变时排队一次尺寸采样 | Queue a single size sampling on resize"""
+        # 拖动/缩放期间 configure-event 连续触发；仅排队一次空闲采样
+        # configure-events fire continuously during drags/resizes; queue at most one idle sampling
+        if self._resize_pending:
+            return
+        self._resize_pending = True
+        GLib.idle_add(self._commit_resize)
+
+    def _commit_resize(self) -> bool:
+        """空闲时读取一次最终尺寸 | Read the final size once at idle"""
+        self._resize_pending = False
+        width, height = self.get_size()
+        if width != self.width or height != self.height:
+            self.width, self.height = width, height
+            self._settings_dirty = True
+            self._schedule_save()
+        return False
+
+    def _schedule_save(self) -> None:
+        """请求一次延迟保存；连续的调整合并为 500ms 后的一次写盘 | Request a deferred save; a burst of adjustments becomes one write 500 ms later"""
+        if self._save_source is None:
+            self._save_source = GLib.timeout_add(500, self._flush_save)
+
+    def _flush_save(self) -> bool:
+        """去抖到期，执行真正的保存 | Debounce expired, perform the actual save"""
+        self._save_source = None
+        self.save_settings()
+        return False
 
     def save_settings(self) -> None:
         """保存当前设置到配置文件 | Save current settings to config file"""
-        self.config["DEFAULT"] = {
-            "theme": self.theme_name,
-            "opacity": self.opacity,
-            "font_size": str(self.font_size),
-            "width": str(self.width),
-            "height": str(self.height),
-            "double_shift_shortcut_enabled": str(self.double_shift_shortcut_enabled).lower(),
-            "double_shift_shortcut": self._shortcut_to_config(self.double_shift_shortcut),
-            "capslock_on": str(self.capslock_on),
-        }
+        # 退出时空闲回调可能来不及跑，把排队中的尺寸采样先补上
+        # Idle callbacks may never run at teardown, so flush any queued size sampling first
+        if self._resize_pending:
+            self._commit_resize()
+        if not self._settings_dirty:
+            return
+        # 直接拼出配置文本；保留 [DEFAULT] 节头，老版本和 configparser 都能读
+        # Assemble the config text directly; the [DEFAULT] header is kept so older builds and configparser can still read it
+        data = (
+            "[DEFAULT]\n"
+            f"theme = {self.theme_name}\n"
+            f"opacity = {self.opacity}\n"
+            f"font_size = {self.font_size}\n"
+            f"width = {self.width}\n"
+            f"height = {self.height}\n"
+            f"double_shift_shortcut_enabled = {str(self.double_shift_shortcut_enabled).lower()}\n"
+            f"double_shift_shortcut = {self._shortcut_to_config(self.double_shift_shortcut)}\n"
+            f"capslock_on = {self.capslock_on}\n"
+        )
+        self._settings_dirty = False
+
+        # 主线程只做廉价的内存序列化；磁盘写入放到工作线程，避免阻塞 GTK 主循环
+        # Serialize in memory on the main thread (cheap); move the disk write to a worker so the GTK loop isn't blocked
+        writer = threading.Thread(target=self._write_config, args=(self.config_file, data))
+        writer.start()
+        # 短暂等待，正常情况下写入瞬间完成；慢盘时不拖住退出流程
+        # Brief join: the write normally finishes instantly, and a slow disk won't stall teardown
+        writer.join(timeout=0.25)
+
+    @staticmethod
+    def _write_config(path: str, data: str) -> None:
+        """原子写入配置文件（先写临时文件再替换） | Atomically write the config file (temp file then replace)"""
+        tmp_path = path + ".tmp"
         try:
-            with open(self.config_file, "w", encoding="utf-8") as fp:
-                self.config.write(fp)
+            # 目录只在真正写盘时才需要存在；启动加载路径不再做 makedirs
+            # The directory only needs to exist when actually writing; the startup load path no longer runs makedirs
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as fp:
+                fp.write(data)
+            os.replace(tmp_path, path)
         except OSError:
             pass
 